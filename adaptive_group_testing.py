@@ -1,11 +1,34 @@
-import math
-from typing import Any, Callable, List, Tuple, TypeVar
+import concurrent.futures
+import logging
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from _gbs_ext import _binary_search_c
+except ImportError:
+    _binary_search_c = None
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
 
 def generalized_binary_splitting(
-    pred: Callable[[List[T]], bool], items: List[T], d: int, verbose: bool = False,
+    pred: Callable[[List[T]], bool],
+    items: List[T],
+    d: int,
+    verbose: bool = False,
+    pred_accepts_array: bool = False,
+    memoize: bool = False,
+    njit_pred: bool = False,
+    executor: Optional[concurrent.futures.Executor] = None,
+    pred_batch: Optional[Callable[[List[List[T]]], List[bool]]] = None,
 ) -> List[T]:
     """Hwang's adaptive generalized binary splitting algorithm for group testing
 
@@ -19,12 +42,49 @@ def generalized_binary_splitting(
     Arguments
     ---------
     pred : callable
-        Test function. Takes a list of items, and returns True if
-        _any_ of the items are defective, and False otherwise.
+        Test function. Takes a sequence of items (a tuple, or an ndarray
+        with ``pred_accepts_array=True`` -- don't assume list methods),
+        and returns True if _any_ of the items are defective, and False
+        otherwise.
     candidates : list
-        Candidate pool. Note, the items must be hashable.
+        Candidate pool. The items need not be hashable (internally the
+        algorithm works on dense integer indices and only translates back
+        to items at the boundaries), except with ``memoize=True``.
     d : int
         Upper bound on the number of defective items in the pool.
+    verbose : bool
+        If True, emit per-iteration progress at DEBUG level on this
+        module's logger (``adaptive_group_testing``).
+    pred_accepts_array : bool
+        If True, ``pred`` is called with ndarray slices of the candidate
+        pool rather than freshly-built lists, skipping a copy per test.
+    memoize : bool
+        If True, cache ``pred`` results keyed on the (unordered) set of
+        items tested, so a subset that comes up twice only costs one call.
+        Worthwhile when ``pred`` is expensive (a lab test, an RPC);
+        requires the items to be hashable. With ``njit_pred=True`` only
+        the Python-level group tests are memoized; calls made inside the
+        compiled search are not.
+    njit_pred : bool
+        If True, ``pred`` must be a numba-jitted function taking an int64
+        ndarray, and the items must be integers. The binary-search inner
+        loop is then compiled with numba as well, removing interpreter
+        overhead when ``pred`` itself is cheap. Requires numba; the first
+        call per ``pred`` pays a one-time compilation cost.
+    executor : concurrent.futures.Executor, optional
+        If given, the individual tests on the final ``<= 2d - 2``
+        candidates are submitted to this executor concurrently instead of
+        run serially. These tests are independent, so this helps when
+        ``pred`` is I/O- or compute-bound; ``pred`` must be safe to call
+        from the executor's workers.
+    pred_batch : callable, optional
+        Batched variant of ``pred``: takes a list of test sets and returns
+        one boolean per set, all evaluated in a single oracle round-trip
+        (e.g. one PCR plate of wells). When provided, the per-defect
+        binary search is replaced by a k-way split that submits several
+        slices per round, reducing the number of round-trips from
+        ``log2(m)`` to about ``log(m) / log(k)``, and the final
+        individual-testing phase is resolved in a single batched call.
 
     Citations
     ---------
@@ -38,40 +98,150 @@ def generalized_binary_splitting(
         list of defective items
     """
     defects = []
-    unsure = list(items)
+    # All algorithmic work happens on dense int64 indices 0..n-1; `items_arr`
+    # is only consulted to build test sets for `pred` and to translate the
+    # answer back to items. Indices are stable for the whole run, so the
+    # index arrays and mask below are packed numeric memory, not PyObjects.
+    nb_search = None
+    items_list = list(items)
+    if njit_pred:
+        if numba is None:
+            raise ImportError("njit_pred=True requires numba to be installed")
+        pred_accepts_array = True
+        items_arr = np.asarray(items_list, dtype=np.int64)
+        nb_search = _make_binary_search_nb(pred)
+    else:
+        items_arr = None
+        if all(isinstance(x, int) for x in items_list):
+            # Candidate ids are very often plain ints (wells, sample
+            # indices); packed int64 storage is 8 B/item versus ~36 B/item
+            # for a list slot plus a boxed int, so the pool stays
+            # cache-resident far longer.
+            try:
+                items_arr = np.asarray(items_list, dtype=np.int64)
+            except OverflowError:
+                items_arr = None
+        if items_arr is None:
+            if pred_accepts_array:
+                items_arr = np.empty(len(items_list), dtype=object)
+                items_arr[:] = items_list
+            else:
+                items_arr = items_list
+
+    # The wrapper must go on after the njit setup above, which has to
+    # compile against the user's unwrapped jitted pred; with njit_pred only
+    # the Python-level calls (group tests and the tail) are memoized.
+    if memoize:
+        inner_pred = pred
+        cache: dict = {}
+
+        def pred(test_set):
+            key = frozenset(test_set)
+            if key not in cache:
+                cache[key] = inner_pred(test_set)
+            return cache[key]
+
+    # `alive[i]` is True iff item i has not yet been ruled defective or
+    # non-defective. `unsure` caches np.flatnonzero(alive): removals just flip
+    # bits in `alive` and trim/filter the cached index array, rather than
+    # rebuilding a hash set over the whole pool every iteration.
+    alive = np.ones(len(items_arr), dtype=bool)
+    unsure = np.flatnonzero(alive)
+    # `lo` is a cursor into `unsure`: entries before it have been ruled out by
+    # negative group tests. Advancing it is the O(1) replacement for copying
+    # the tail of the pool after every negative test.
+    lo = 0
     if len(unsure) == 0:
         return []
 
-    while len(unsure) > 0:
-        n = len(unsure)
-    
-        if verbose:
-            print(f"Unsure: {n}")
-            print(f"Defects: {len(defects)}")
+    while len(unsure) - lo > 0:
+        n = len(unsure) - lo
+
+        if verbose and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Unsure: %d", n)
+            logger.debug("Defects: %d", len(defects))
 
         if n == 1 or n <= 2 * d - 2:
-            if verbose:
-                print(f"Switching to individual testing for remaining {n} candidates")
+            if verbose and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Switching to individual testing for remaining %d candidates", n
+                )
 
-            for c in unsure:
-                if pred([c]):
-                    defects.append(c)
+            tail = unsure[lo:]
+            test_sets = [
+                items_arr[pos : pos + 1] if pred_accepts_array else (items_list[pos],)
+                for pos in tail
+            ]
+            if pred_batch is not None:
+                # One oracle round-trip for the whole tail instead of a
+                # pred call per remaining candidate.
+                outcomes = pred_batch(test_sets)
+            elif executor is not None:
+                outcomes = executor.map(pred, test_sets)
+            else:
+                outcomes = map(pred, test_sets)
+            for pos, hit in zip(tail, outcomes):
+                if hit:
+                    defects.append(items_list[pos])
+                    if len(defects) >= d:
+                        break
             return defects
 
         else:
             l = n - d + 1
-            alpha = math.floor(math.log2(l / 2))
-            test_set = unsure[: 2 ** alpha]
+            # floor(log2(l / 2)) computed with integer bit ops: exact at
+            # powers of two and never touches the FPU.
+            alpha = max(0, (l // 2).bit_length() - 1)
+            k = 1 << alpha
+            # Zero-copy view of the block under test; the items themselves
+            # are only gathered inside the pred call.
+            head = unsure[lo : lo + k]
 
-            if pred(test_set):
-                single_defect, confirmed_okay = _binary_search(pred, test_set)
+            if pred(items_arr[head] if pred_accepts_array else tuple(map(items_list.__getitem__, head))):
+                if pred_batch is not None:
+                    defect_pos, confirmed_okay = _binary_search_kway(
+                        pred_batch,
+                        items_arr if pred_accepts_array else items_list,
+                        head,
+                        k=max(2, alpha),
+                        pred_accepts_array=pred_accepts_array,
+                    )
+                elif nb_search is not None:
+                    defect_pos, confirmed_okay = nb_search(
+                        items_arr, np.ascontiguousarray(head, dtype=np.int64)
+                    )
+                elif _binary_search_c is not None:
+                    if pred_accepts_array:
+                        idx_pred = lambda pos: pred(items_arr[pos])
+                    else:
+                        idx_pred = lambda pos: pred(tuple(map(items_list.__getitem__, pos)))
+                    defect_pos, confirmed_okay = _binary_search_c(
+                        np.ascontiguousarray(head, dtype=np.int64), idx_pred
+                    )
+                else:
+                    defect_pos, confirmed_okay = _binary_search(
+                        pred,
+                        items_arr if pred_accepts_array else items_list,
+                        head,
+                        pred_accepts_array=pred_accepts_array,
+                    )
 
-                defects.append(single_defect)
-                unsure = list(set(unsure) - {single_defect} - set(confirmed_okay))
+                defects.append(items_list[defect_pos])
+                # d is an upper bound on the number of defectives, so once
+                # d have been found no remaining item can test positive;
+                # skip the would-be negative tests on the rest of the pool.
+                if len(defects) >= d:
+                    return defects
+                alive[defect_pos] = False
+                alive[confirmed_okay] = False
+                window = unsure[lo:]
+                unsure = window[alive[window]]
+                lo = 0
             else:
-                unsure = unsure[2 ** alpha :]
-        
-        if len(unsure) == n:
+                alive[head] = False
+                lo += k
+
+        if len(unsure) - lo == n:
             raise RuntimeError()
 
     raise RuntimeError()
@@ -79,32 +249,150 @@ def generalized_binary_splitting(
 
 def _binary_search(
     pred: Callable[[List[T]], bool],
-    candidates: List[T],
-) -> Tuple[T, List[T]]:
+    items_arr: Any,
+    candidates: np.ndarray,
+    pred_accepts_array: bool = False,
+) -> Tuple[int, np.ndarray]:
+    """Locate a single defective among `candidates`, a group known to test
+    positive.
+
+    `candidates` holds integer indices into `items_arr` (any indexable
+    sequence); the returned defect and the confirmed-nondefective array are
+    likewise indices, not items.
+    """
+    # With two candidates a single test settles everything: whichever side
+    # the one test implicates is the defect, no loop or buffer needed.
+    if len(candidates) == 2:
+        first = candidates[:1]
+        if pred(items_arr[first] if pred_accepts_array else (items_arr[first[0]],)):
+            return candidates[0], np.empty(0, dtype=np.int64)
+        return candidates[1], np.asarray(first, dtype=np.int64)
 
     mid = 0
     start = 0
     end = len(candidates)
-    nondefective = []
+    # Ruled-out candidates are streamed into a single preallocated buffer
+    # (at most all-but-one candidate can be ruled out), so there is one
+    # allocation per search rather than a growing list plus a final
+    # concatenate.
+    nondefective = np.empty(end, dtype=np.int64)
+    n_nd = 0
 
     while start < end - 1:
         mid = (start + end) // 2
 
-        test_set = candidates[start:mid]
-        if pred(test_set):
+        test_pos = candidates[start:mid]
+        if pred(items_arr[test_pos] if pred_accepts_array else tuple(map(items_arr.__getitem__, test_pos))):
             end = mid
         else:
-            nondefective.extend(test_set)
+            nondefective[n_nd : n_nd + mid - start] = test_pos
+            n_nd += mid - start
             start = mid
 
+    return candidates[start], nondefective[:n_nd]
+
+
+def _binary_search_kway(
+    pred_batch: Callable[[List[List[T]]], List[bool]],
+    items_arr: Any,
+    candidates: np.ndarray,
+    k: int,
+    pred_accepts_array: bool = False,
+) -> Tuple[int, np.ndarray]:
+    """k-way variant of `_binary_search` for a batched oracle.
+
+    Each round splits the live range into up to `k` chunks and submits the
+    first k-1 of them to `pred_batch` in one call. The leftmost positive
+    chunk (or the last chunk, if every submitted one is negative) must
+    contain a defect; every chunk that tested negative is confirmed
+    non-defective, including those past the chunk we descend into.
+    """
+    start = 0
+    end = len(candidates)
+    nondefective = []
+
+    while end - start > 1:
+        span = end - start
+        kk = min(k, span)
+        bounds = [start + (span * i) // kk for i in range(kk + 1)]
+
+        test_sets = []
+        for i in range(kk - 1):
+            test_pos = candidates[bounds[i] : bounds[i + 1]]
+            test_sets.append(
+                items_arr[test_pos]
+                if pred_accepts_array
+                else tuple(map(items_arr.__getitem__, test_pos))
+            )
+        outcomes = list(pred_batch(test_sets))
+
+        j = kk - 1
+        for i, hit in enumerate(outcomes):
+            if hit:
+                j = i
+                break
+        for i in range(kk - 1):
+            if i != j and not outcomes[i]:
+                nondefective.append(candidates[bounds[i] : bounds[i + 1]])
+
+        start, end = bounds[j], bounds[j + 1]
+
+    if nondefective:
+        nondefective = np.concatenate(nondefective)
+    else:
+        nondefective = np.empty(0, dtype=candidates.dtype)
     return candidates[start], nondefective
 
 
+# Compiled _binary_search variants, keyed by the jitted pred they close over.
+# numba specializes on the closure, so each distinct pred needs its own
+# compilation (cached here to pay that cost once per pred, not per call).
+_nb_search_cache: dict = {}
+
+
+def _make_binary_search_nb(pred):
+    """Compile a numba version of `_binary_search` specialized to `pred`.
+
+    `pred` must itself be numba-callable and accept an int64 ndarray of
+    items. The compiled search takes (items_arr, candidates) like the
+    Python version, with nondefective positions streamed into a
+    preallocated array instead of a list.
+    """
+    try:
+        return _nb_search_cache[pred]
+    except KeyError:
+        pass
+
+    @numba.njit(cache=False)
+    def search(items_arr, candidates):
+        start = 0
+        end = len(candidates)
+        nondefective = np.empty(len(candidates), dtype=np.int64)
+        n_nd = 0
+
+        while start < end - 1:
+            mid = (start + end) // 2
+
+            if pred(items_arr[candidates[start:mid]]):
+                end = mid
+            else:
+                sz = mid - start
+                nondefective[n_nd : n_nd + sz] = candidates[start:mid]
+                n_nd += sz
+                start = mid
+
+        return candidates[start], nondefective[:n_nd]
+
+    _nb_search_cache[pred] = search
+    return search
+
+
 def test_binary_search():
-    candidates = list(range(100))
-    for c in candidates:
-        res, non_defective = _binary_search((lambda x: c in x), candidates)
-        assert res == c
+    items_arr = list(range(100))
+    candidates = np.arange(100)
+    for c in range(100):
+        res, non_defective = _binary_search((lambda x: c in x), items_arr, candidates)
+        assert items_arr[res] == c
 
 
 def test_generalized_binary_splitting():
@@ -121,5 +409,114 @@ def test_generalized_binary_splitting():
     import random
     random.shuffle(candidates)
     
-    assert sorted(generalized_binary_splitting(pred, candidates, d=2)) == list(range(d))
+    result = generalized_binary_splitting(pred, candidates, d=d)
+    assert sorted(result) == list(range(d))
+    # defects come back as the caller's original objects, not numpy scalars
+    assert all(type(x) is int for x in result)
     print(n_calls)
+
+
+def test_generalized_binary_splitting_array_pred():
+    d = 5
+    N = 10000
+
+    def pred(xs):
+        assert isinstance(xs, np.ndarray)
+        return bool((xs < d).any())
+
+    candidates = list(range(N))
+    import random
+    random.shuffle(candidates)
+
+    result = generalized_binary_splitting(pred, candidates, d=d, pred_accepts_array=True)
+    assert sorted(result) == list(range(d))
+
+
+def test_generalized_binary_splitting_memoize():
+    d = 3
+    N = 1000
+    n_calls = 0
+
+    def pred(xs):
+        nonlocal n_calls
+        n_calls += 1
+        return any(x < d for x in xs)
+
+    candidates = list(range(N))
+    result = generalized_binary_splitting(pred, candidates, d=d, memoize=True)
+    assert sorted(result) == list(range(d))
+
+    baseline = n_calls
+    n_calls = 0
+    generalized_binary_splitting(pred, candidates, d=d)
+    assert baseline <= n_calls
+
+
+def test_generalized_binary_splitting_njit():
+    if numba is None:
+        return
+
+    d = 5
+    N = 10000
+
+    @numba.njit
+    def pred(xs):
+        for x in xs:
+            if x < 5:
+                return True
+        return False
+
+    candidates = list(range(N))
+    import random
+    random.shuffle(candidates)
+
+    result = generalized_binary_splitting(pred, candidates, d=d, njit_pred=True)
+    assert sorted(result) == list(range(d))
+
+
+def test_generalized_binary_splitting_executor():
+    d = 3
+    N = 1000
+
+    def pred(xs):
+        return any(x < d for x in xs)
+
+    candidates = list(range(N))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        result = generalized_binary_splitting(pred, candidates, d=d, executor=executor)
+    assert sorted(result) == list(range(d))
+
+
+def test_generalized_binary_splitting_pred_batch():
+    d = 5
+    N = 10000
+
+    def pred(xs):
+        return any(x < d for x in xs)
+
+    def pred_batch(test_sets):
+        return [any(x < d for x in xs) for xs in test_sets]
+
+    candidates = list(range(N))
+    import random
+    random.shuffle(candidates)
+
+    result = generalized_binary_splitting(pred, candidates, d=d, pred_batch=pred_batch)
+    assert sorted(result) == list(range(d))
+
+
+def test_pred_receives_original_ints():
+    d = 4
+    N = 5000
+
+    def pred(xs):
+        # pred must see the caller's own objects, not numpy scalars
+        assert all(type(x) is int for x in xs)
+        return any(x < d for x in xs)
+
+    candidates = list(range(N))
+    import random
+    random.shuffle(candidates)
+
+    result = generalized_binary_splitting(pred, candidates, d=d)
+    assert sorted(result) == list(range(d))
@@ -1,4 +1,5 @@
 { buildPythonPackage
+, numpy
 , pytestCheckHook
 }:
 
@@ -8,6 +9,8 @@ buildPythonPackage rec {
 
   src = ./.;
 
+  propagatedBuildInputs = [ numpy ];
+
   checkInputs = [ pytestCheckHook ];
   pytestFlagsArray = [ "adaptive_group_testing.py" ];
 
@@ -1,7 +1,17 @@
 from setuptools import setup
 
+# The Cython extension accelerates _binary_search but is strictly
+# optional; the pure-Python implementation is used when it is absent.
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(["_gbs_ext.pyx"])
+except ImportError:
+    ext_modules = []
+
 setup(
     name='sconsconfig',
     version='0.1',
     py_modules=["adaptive_group_testing"],
+    install_requires=["numpy"],
+    ext_modules=ext_modules,
 )